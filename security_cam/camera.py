@@ -83,6 +83,18 @@ class BaseCamera:
         """
         return False
 
+    def set_controls(self, controls: dict) -> bool:
+        """Apply several camera controls in one batched call if supported.
+
+        Args:
+          controls: Backend control names mapped to values (e.g.,
+            `{"ExposureValue": 0.4, "AnalogueGain": 2.0}`).
+
+        Returns:
+          True if applied; False if unsupported or failed.
+        """
+        return False
+
 
 class PiCamera2Wrapper(BaseCamera):
     """PiCamera2-based camera backend for CSI-connected camera modules."""
@@ -247,6 +259,21 @@ class PiCamera2Wrapper(BaseCamera):
         except Exception:
             return False
 
+    def set_controls(self, controls: dict) -> bool:
+        """Apply a batch of controls atomically via Picamera2.
+
+        libcamera applies all controls passed in one `set_controls` call on the
+        same frame, so batching EV/gain/shutter changes avoids multiple ioctl
+        round-trips.
+        """
+        try:
+            if not self._started or self.picam2 is None or not controls:
+                return False
+            self.picam2.set_controls(dict(controls))
+            return True
+        except Exception:
+            return False
+
     def supports_shutter(self) -> bool:
         """Picamera2 supports manual ExposureTime control."""
         return True
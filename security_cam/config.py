@@ -44,6 +44,10 @@ class Config:
     CAMERA_PROFILE = os.getenv("SC_CAMERA_PROFILE", "noir").strip().lower()  # standard|noir
     # Prefer YUV420 (Picamera2) to access luma plane; set 0 to use RGB888
     USE_YUV = os.getenv("SC_USE_YUV", "1") == "1"
+    # Run frame preprocessing (rotate / NOIR mono / enhancement) through
+    # OpenCV's OpenCL T-API when a device is available (VideoCore VI on Pi 4,
+    # iGPU on x86). Off by default; ignored when OpenCL is unavailable.
+    USE_OPENCL = os.getenv("SC_USE_OPENCL", "0") == "1"
     # Autofocus (Picamera2): mode and optional lock position
     AF_MODE = os.getenv("SC_AF_MODE", "auto").strip().lower()  # auto|continuous|manual
     AF_LENS_POSITION = float(os.getenv("SC_AF_LENS_POSITION", "-1"))  # -1 disables manual set
@@ -51,6 +55,15 @@ class Config:
 
     # Detection
     DETECT_EVERY_N_FRAMES = int(os.getenv("SC_DETECT_EVERY_N_FRAMES", 1))  # Run detector every N frames
+    # Accumulate this many qualifying frames before running detection as one
+    # batch. Defaults to 1 (off): frame differencing gains nothing from
+    # batching and accumulation delays alerts, but detectors with a batched
+    # backend can profit from larger values.
+    DETECT_BATCH_SIZE = int(os.getenv("SC_DETECT_BATCH_SIZE", 1))
+    # Flush a partially filled batch after this long, so detection never
+    # sits on accumulated frames indefinitely when qualifying frames stop
+    # arriving (e.g. the detect stride slows under poor exposure).
+    DETECT_BATCH_TIMEOUT_SEC = float(os.getenv("SC_DETECT_BATCH_TIMEOUT_SEC", 1.0))
 
     # Motion detector (frame differencing) parameters
     MOTION_DOWNSCALE = float(os.getenv("SC_MOTION_DOWNSCALE", 1.0))  # 0.2..1.0, lower = faster/more smoothing
@@ -115,6 +128,13 @@ class Config:
     _SAVE_DIR_NORM = os.path.expanduser(os.path.expandvars(_SAVE_DIR_NORM))
     SAVE_DIR = os.path.abspath(_SAVE_DIR_NORM) if not os.path.isabs(_SAVE_DIR_NORM) else _SAVE_DIR_NORM  # absolute path
     SAVE_ON_DETECT = os.getenv("SC_SAVE_ON_DETECT", "1") == "1"  # Save when a detection occurs
+    # JPEG quality for saved captures. OpenCV defaults to 95 with Huffman
+    # optimization, the slowest encode path; 85 is visually equivalent for
+    # surveillance footage and markedly cheaper on the Pi.
+    SAVE_JPEG_QUALITY = int(os.getenv("SC_SAVE_JPEG_QUALITY", 85))
+    # Encode saves with libjpeg-turbo via simplejpeg when installed; falls
+    # back to cv2.imwrite when the package is missing or the flag is off
+    SAVE_USE_TURBOJPEG = os.getenv("SC_SAVE_USE_TURBOJPEG", "1") == "1"
     SAVE_INTERVAL_SEC = float(os.getenv("SC_SAVE_INTERVAL_SEC", 0.5))  # Minimum seconds between saves
     MAX_SAVED_IMAGES = int(os.getenv("SC_MAX_SAVED_IMAGES", 1000))  # Retention limit for saved images
 
@@ -130,13 +150,37 @@ class Config:
     _SAVE_DIR_RAW2_N = os.path.expanduser(os.path.expandvars(_SAVE_DIR_RAW2_N))
     SAVE_DIR_RAW = os.path.abspath(_SAVE_DIR_RAW2_N) if not os.path.isabs(_SAVE_DIR_RAW2_N) else _SAVE_DIR_RAW2_N
     SAVE_RAW_ON_DETECT = os.getenv("SC_SAVE_RAW_ON_DETECT", "1") == "1"
+    # Downscaled thumbnail variants written alongside annotated captures and
+    # served from /thumb/ so gallery tiles never download full-resolution JPEGs
+    _SAVE_DIR_TH = os.getenv("SC_SAVE_DIR_THUMB", os.path.join("data", "captures_thumb"))
+    _SAVE_DIR_TH_N = str(_SAVE_DIR_TH).strip().strip('"').strip("'")
+    _SAVE_DIR_TH_N = os.path.expanduser(os.path.expandvars(_SAVE_DIR_TH_N))
+    SAVE_DIR_THUMB = os.path.abspath(_SAVE_DIR_TH_N) if not os.path.isabs(_SAVE_DIR_TH_N) else _SAVE_DIR_TH_N
+    SAVE_THUMBNAILS = os.getenv("SC_SAVE_THUMBNAILS", "1") == "1"
+    THUMB_WIDTH = int(os.getenv("SC_THUMB_WIDTH", 200))  # Thumbnail width in pixels
+    THUMB_JPEG_QUALITY = int(os.getenv("SC_THUMB_JPEG_QUALITY", 70))
 
     # Dashboard
     ALERT_COOLDOWN_SEC = float(os.getenv("SC_ALERT_COOLDOWN_SEC", 10.0))  # Keep alert banner visible this long
     GALLERY_LATEST_COUNT = int(os.getenv("SC_GALLERY_LATEST_COUNT", 9))  # Recent images shown on dashboard
+    # One JPEG quality for both /latest.jpg and /stream.mjpg. Separate
+    # qualities (80/60) forced two encodes of every frame when the dashboard
+    # poller and a stream viewer were active; a shared 75 halves encode CPU
+    # because both endpoints serve the encoder worker's one cached buffer.
+    JPEG_QUALITY = int(os.getenv("SC_JPEG_QUALITY", 75))
     HOST = os.getenv("SC_HOST", "0.0.0.0")  # Flask bind host
     PORT = int(os.getenv("SC_PORT", 8000))  # Flask bind port
     DEBUG = os.getenv("SC_DEBUG", "0") == "1"  # Flask debug switch
+    # Emit X-Sendfile headers for capture downloads so a fronting reverse
+    # proxy (nginx/caddy) can sendfile(2) the JPEG from disk with no Python
+    # copy. Off by default: without a proxy honoring the header, responses
+    # would have empty bodies. For nginx, use an `internal;` location and
+    # X-Accel-Redirect instead.
+    USE_X_SENDFILE = os.getenv("SC_USE_X_SENDFILE", "0") == "1"
+    # Maximum concurrent MJPEG stream viewers. Each viewer holds a server
+    # thread for the life of the connection; past the cap new viewers get
+    # an immediate 503 instead of starving dashboard/API requests.
+    STREAM_MAX_CLIENTS = int(os.getenv("SC_STREAM_MAX_CLIENTS", 4))
 
     # Schedule (comma-separated daily windows, e.g., "22:00-06:00,12:30-13:30").
     # Empty means always armed.
@@ -166,6 +210,19 @@ class Config:
     EXP_HIGH_CLIP_FRAC = float(os.getenv("SC_EXP_HIGH_CLIP_FRAC", 0.05))  # Fraction near max intensity
     EXP_LOW_CLIP_FRAC = float(os.getenv("SC_EXP_LOW_CLIP_FRAC", 0.03))   # Fraction near min intensity
     EXP_EMA_ALPHA = float(os.getenv("SC_EXP_EMA_ALPHA", 0.35))  # Smoothing factor for exposure metrics (0..1)
+    # Pixel stride for exposure statistics: analyze every Nth row/column.
+    # Mean and clip fractions are unbiased under uniform subsampling, so a
+    # stride of 8 touches ~64x fewer pixels for the same EMA behavior.
+    EXP_SAMPLE_STEP = int(os.getenv("SC_EXP_SAMPLE_STEP", 8))
+    # Run exposure analysis every Nth frame. Scene brightness changes slowly
+    # relative to capture FPS; the EMA is advanced in closed form for the
+    # skipped frames so smoothing converges as if it ran every frame.
+    EXP_ANALYZE_EVERY_N_FRAMES = int(os.getenv("SC_EXP_ANALYZE_EVERY_N_FRAMES", 5))
+    # Gray plane used for exposure metrics: 'green' extracts the green channel
+    # (one plane memcpy; a good-enough luminance proxy for brightness stats,
+    # and exact in NOIR mode where all channels are identical), while 'luma'
+    # keeps the weighted BGR->GRAY conversion.
+    EXPOSURE_GRAY_MODE = os.getenv("SC_EXPOSURE_GRAY_MODE", "green").strip().lower()  # green|luma
     ADAPT_HIT_THRESHOLD_DELTA = float(os.getenv("SC_ADAPT_HIT_THRESHOLD_DELTA", 0.5))  # Extra HOG threshold
     ADAPT_MIN_SIZE_SCALE = float(os.getenv("SC_ADAPT_MIN_SIZE_SCALE", 1.2))  # Increase min person size
     ADAPT_DETECT_STRIDE_SCALE = float(os.getenv("SC_ADAPT_DETECT_STRIDE_SCALE", 2.0))  # Slow detection cadence
@@ -72,6 +72,23 @@ class MotionDetector:
         gray = cv2.GaussianBlur(gray, (k, k), 0)
         return gray, scale
 
+    def detect_batch(self, frames_bgr: List[np.ndarray], **_: Any) -> List[List[Detection]]:
+        """Run detection over consecutive frames in capture order.
+
+        Frame differencing is inherently sequential (each frame diffs against
+        the baseline left by the previous one), so this chains `detect` calls.
+        It exists as the batching extension point: callers can accumulate
+        frames to amortize per-tick overhead, and detectors with a vectorized
+        backend can override it with a true batched pass.
+
+        Args:
+          frames_bgr: Frames in capture order.
+
+        Returns:
+          One detection list per input frame, in the same order.
+        """
+        return [self.detect(f) for f in frames_bgr]
+
     def detect(self, frame_bgr: np.ndarray, **_: Any) -> List[Detection]:
         cur, scale = self._prep(frame_bgr)
         if self.prev is None:
@@ -0,0 +1,157 @@
+"""Optional Numba-accelerated kernels for per-frame numeric work.
+
+Numba is an optional dependency (like Picamera2): when it is installed the
+service uses the fused kernels below — LLVM emits SIMD/NEON for them on the
+Pi — and when it is not, each kernel name is None and callers fall back to
+their OpenCV/NumPy paths.
+"""
+
+import numpy as np  # Arrays
+
+try:
+    import numba  # Optional JIT compiler; absent on minimal installs
+    from numba import prange
+except Exception:
+    numba = None
+
+
+if numba is not None:
+
+    @numba.njit(cache=True, fastmath=True, parallel=True)
+    def exposure_stats_bgr(bgr):
+        """Compute luma mean and clip fractions over a BGR uint8 frame.
+
+        Fuses the BGR->luma conversion with the mean and the <=5 / >=250 clip
+        counts into a single pass over the pixel bytes, with no intermediate
+        gray image or mask temporaries. Luma uses integer BT.601-style weights
+        `(B*29 + G*150 + R*77) >> 8`.
+
+        Args:
+          bgr: HxWx3 uint8 frame.
+
+        Returns:
+          `(mean, low_clip_fraction, high_clip_fraction)` floats.
+        """
+        h, w, _ = bgr.shape
+        total = h * w
+        s = 0
+        lc = 0
+        hc = 0
+        for y in prange(h):
+            for x in range(w):
+                b = int(bgr[y, x, 0])
+                g = int(bgr[y, x, 1])
+                r = int(bgr[y, x, 2])
+                yv = (b * 29 + g * 150 + r * 77) >> 8
+                s += yv
+                if yv <= 5:
+                    lc += 1
+                if yv >= 250:
+                    hc += 1
+        return s / total, lc / total, hc / total
+
+    @numba.njit(cache=True, fastmath=True, parallel=True)
+    def exposure_stats_gray(gray):
+        """Compute mean and clip fractions over a uint8 gray plane.
+
+        Counterpart of `exposure_stats_bgr` for callers that already hold a
+        luma plane (e.g. the camera's Y output in NOIR mode): one parallel
+        pass, no histogram or mask temporaries.
+
+        Args:
+          gray: HxW uint8 plane.
+
+        Returns:
+          `(mean, low_clip_fraction, high_clip_fraction)` floats.
+        """
+        h, w = gray.shape
+        total = h * w
+        s = 0
+        lc = 0
+        hc = 0
+        for y in prange(h):
+            for x in range(w):
+                v = gray[y, x]
+                s += v
+                if v <= 5:
+                    lc += 1
+                if v >= 250:
+                    hc += 1
+        return s / total, lc / total, hc / total
+
+    @numba.njit(cache=True, fastmath=True, parallel=True)
+    def preprocess_mono(src, dst, alpha, beta, rot180):
+        """Fused NOIR preprocess: rotate + mono render + enhance + stats.
+
+        Replaces the cv2.rotate / BGR2GRAY / merge / convertScaleAbs chain
+        with one pass that reads each source pixel once and writes the final
+        mono BGR result once. Exposure statistics come from the unscaled luma
+        in the same pass, so enhancement never feeds back into its own
+        control loop. `rot180` is fixed per configuration, so the branch
+        predicts perfectly; pass `alpha=1.0, beta=0.0` for a plain render.
+
+        Args:
+          src: HxWx3 uint8 BGR frame.
+          dst: HxWx3 uint8 output buffer of the same shape.
+          alpha: Contrast gain applied to the rendered luma.
+          beta: Brightness offset applied to the rendered luma.
+          rot180: Whether to rotate the output by 180 degrees.
+
+        Returns:
+          `(mean, low_clip_fraction, high_clip_fraction)` of the raw luma.
+        """
+        h, w, _ = src.shape
+        total = h * w
+        s = 0
+        lc = 0
+        hc = 0
+        if rot180:
+            for y in prange(h):
+                oy = h - 1 - y
+                for x in range(w):
+                    b = int(src[y, x, 0])
+                    g = int(src[y, x, 1])
+                    r = int(src[y, x, 2])
+                    yv = (b * 29 + g * 150 + r * 77) >> 8
+                    s += yv
+                    if yv <= 5:
+                        lc += 1
+                    if yv >= 250:
+                        hc += 1
+                    v = yv * alpha + beta
+                    if v < 0.0:
+                        v = 0.0
+                    elif v > 255.0:
+                        v = 255.0
+                    ox = w - 1 - x
+                    iv = np.uint8(v)
+                    dst[oy, ox, 0] = iv
+                    dst[oy, ox, 1] = iv
+                    dst[oy, ox, 2] = iv
+        else:
+            for y in prange(h):
+                for x in range(w):
+                    b = int(src[y, x, 0])
+                    g = int(src[y, x, 1])
+                    r = int(src[y, x, 2])
+                    yv = (b * 29 + g * 150 + r * 77) >> 8
+                    s += yv
+                    if yv <= 5:
+                        lc += 1
+                    if yv >= 250:
+                        hc += 1
+                    v = yv * alpha + beta
+                    if v < 0.0:
+                        v = 0.0
+                    elif v > 255.0:
+                        v = 255.0
+                    iv = np.uint8(v)
+                    dst[y, x, 0] = iv
+                    dst[y, x, 1] = iv
+                    dst[y, x, 2] = iv
+        return s / total, lc / total, hc / total
+
+else:
+    exposure_stats_bgr = None
+    exposure_stats_gray = None
+    preprocess_mono = None
@@ -1,23 +1,71 @@
 """Background capture/detection service for the security camera app."""
 
 import os
+import queue
+import sys
 import threading
 import time
-from dataclasses import dataclass, field
+from collections import Counter, deque
+from dataclasses import dataclass, field, replace
 from typing import List, Optional
 
 import cv2
 import numpy as np
 
+try:
+    import simplejpeg  # Optional libjpeg-turbo encoder; absent on minimal installs
+except Exception:
+    simplejpeg = None
+
 from .camera import BaseCamera, make_camera
 from .config import Config
 from .detector import MotionDetector
+from .kernels import exposure_stats_bgr, exposure_stats_gray, preprocess_mono
 from .schedule import DailySchedule
 
+# Intensity index used to derive the mean from a 256-bin histogram
+_HIST_IDX = np.arange(256)
+
+# Label text geometry per detection kind; font and scale are constant, so each
+# label string is measured once per process instead of once per saved frame
+_LABEL_SIZES: dict = {}
+
+
+def _encode_jpeg(frame: np.ndarray, quality: int) -> Optional[bytes]:
+    """Encode a BGR frame to JPEG bytes, or None on failure.
+
+    Prefers simplejpeg (libjpeg-turbo's SIMD path, encodes BGR directly) and
+    falls back to cv2.imencode when the package is not installed.
+    """
+    if simplejpeg is not None:
+        try:
+            return simplejpeg.encode_jpeg(
+                np.ascontiguousarray(frame), quality=quality, colorspace="BGR", fastdct=True
+            )
+        except Exception:
+            pass
+    ok, buf = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    return buf.tobytes() if ok else None
+
+
+def _hist_stats(gray: np.ndarray) -> tuple:
+    """Mean and clip fractions of a uint8 gray plane via one calcHist pass."""
+    hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+    total = float(gray.size)
+    return (
+        float((hist * _HIST_IDX).sum() / total),
+        float(hist[:6].sum() / total),
+        float(hist[250:].sum() / total),
+    )
+
 
-@dataclass
+@dataclass(slots=True)
 class ServiceState:
-    """Observable service state used by the web API and dashboard."""
+    """Observable service state used by the web API and dashboard.
+
+    Slots keep the per-frame attribute stores compact (no instance dict) and
+    make copying for `get_status` snapshots cheap.
+    """
     detecting: bool = False
     last_detection_ts: float = 0.0
     saved_images_count: int = 0
@@ -36,6 +84,34 @@ class ServiceState:
     gain: float = 0.0
     shutter_us: int = 0
 
+    def snapshot(self) -> dict:
+        """Return every field as a plain dict for the web handlers.
+
+        The dashboard render and /api/state consume the same payload, so
+        the field list and the shutter_us -> shutter_ms derivation live in
+        one place instead of being repeated per handler.
+        """
+        return {
+            "detecting": self.detecting,
+            "last_detection_ts": self.last_detection_ts,
+            "saved_images_count": self.saved_images_count,
+            "total_frames": self.total_frames,
+            "armed": self.armed,
+            "exposure_state": self.exposure_state,
+            "exposure_mean": self.exposure_mean,
+            "exposure_low_clip": self.exposure_low_clip,
+            "exposure_high_clip": self.exposure_high_clip,
+            "detect_stride": self.detect_stride,
+            "hit_threshold": self.hit_threshold,
+            "person_count": self.person_count,
+            "face_count": self.face_count,
+            "kinds": self.last_kinds,
+            "ev_bias": self.ev_bias,
+            "gain": self.gain,
+            "shutter_us": self.shutter_us,
+            "shutter_ms": self.shutter_us // 1000,
+        }
+
 
 class SecurityCamService:
     """Owns the camera loop, detection cadence, and image saving."""
@@ -50,22 +126,102 @@ class SecurityCamService:
         self.schedule = DailySchedule(self.config.ACTIVE_WINDOWS)
         self._thread: Optional[threading.Thread] = None
         self._stop = threading.Event()
-        self._frame_lock = threading.Lock()
-        self._latest_frame: Optional[np.ndarray] = None
+        # Detection worker: the capture loop hands qualifying frames over via
+        # a single-slot inbox (latest frame wins) so a slow detect/save never
+        # delays the next camera read. On standard CPython the threads already
+        # overlap around OpenCV's GIL releases; on a free-threaded build they
+        # run fully in parallel.
+        self._detect_thread: Optional[threading.Thread] = None
+        self._detect_inbox: Optional[tuple] = None
+        self._detect_event = threading.Event()
+        # Image writer: JPEG encode + disk IO cost tens of ms per save on the
+        # Pi, so saves go through a bounded queue to a daemon writer thread.
+        # Enqueue drops the save when the queue is full to preserve realtime.
+        self._save_q: queue.Queue = queue.Queue(maxsize=8)
+        self._save_thread: Optional[threading.Thread] = None
+        # Encoder worker: keeps latest-frame JPEGs pre-built per quality while
+        # HTTP clients are polling, so N viewers read shared bytes instead of
+        # each encoding on the request thread
+        self._jpeg_lock = threading.Lock()
+        self._jpeg_cache: dict = {}  # quality -> (seq, bytes)
+        self._jpeg_demand: dict = {}  # quality -> last request (monotonic)
+        self._encode_thread: Optional[threading.Thread] = None
+        # Triple buffer for the latest frame: the capture loop publishes into
+        # the next slot and flips `_ready_idx`; readers borrow the published
+        # slot without copying. The index store is atomic under the GIL, and a
+        # borrowed frame stays valid until the producer wraps around.
+        self._frames: List[Optional[np.ndarray]] = [None, None, None]
+        self._frame_seqs: List[int] = [0, 0, 0]
+        self._frame_seq: int = 0
+        self._ready_idx: int = -1
+        # Notified once per published frame so stream clients can block for
+        # the next frame instead of polling on a short sleep
+        self._new_frame = threading.Condition()
+        # Reused conversion buffers. The gray scratch plane is consumed within
+        # the same loop iteration, so one buffer is enough; the mono BGR
+        # render can itself be published, so it needs one buffer per triple-
+        # buffer slot to honor the borrow-until-wrap-around contract.
+        self._gray_buf: Optional[np.ndarray] = None
+        self._mono_bufs: List[Optional[np.ndarray]] = [None, None, None]
+        self._enh_bufs: List[Optional[np.ndarray]] = [None, None, None]
         self._last_saved_ts: float = 0.0
+        # Fixed-rotation code resolved once; None means no rotation
+        self._rot_code: Optional[int] = {
+            90: cv2.ROTATE_90_CLOCKWISE,
+            180: cv2.ROTATE_180,
+            270: cv2.ROTATE_90_COUNTERCLOCKWISE,
+        }.get(int(self.config.ROTATE_DEGREES))
+        # OpenCL T-API preprocessing: only when requested and a device exists
+        self._use_opencl = False
+        if self.config.USE_OPENCL:
+            try:
+                self._use_opencl = bool(cv2.ocl.haveOpenCL())
+                cv2.ocl.setUseOpenCL(self._use_opencl)
+            except Exception:
+                self._use_opencl = False
         os.makedirs(self.config.SAVE_DIR, exist_ok=True)
         # Ensure raw save directory exists too (for /captures_raw and raw saving)
         try:
             os.makedirs(self.config.SAVE_DIR_RAW, exist_ok=True)
         except Exception:
             pass
+        if self.config.SAVE_THUMBNAILS:
+            try:
+                os.makedirs(self.config.SAVE_DIR_THUMB, exist_ok=True)
+            except Exception:
+                pass
+        # Saved-image bookkeeping per folder (oldest first), seeded from one
+        # startup scan so retention never rescans the directory on save
+        self._saved_files = {
+            self.config.SAVE_DIR: self._seed_saved_files(self.config.SAVE_DIR),
+            self.config.SAVE_DIR_RAW: self._seed_saved_files(self.config.SAVE_DIR_RAW),
+        }
+        # Basenames of annotated captures, newest first, rebuilt by the writer
+        # thread on each save so listing endpoints never touch the filesystem.
+        # Readers see either the old or the new list (atomic rebind).
+        self._recent_names: List[str] = [
+            os.path.basename(p) for p in reversed(self._saved_files[self.config.SAVE_DIR])
+        ]
         # Adaptive internals
         self._detect_stride_base = max(1, self.config.DETECT_EVERY_N_FRAMES)
         self._detect_stride_dyn = self._detect_stride_base
+        # Modulo-free stride bookkeeping: the countdown is decremented each
+        # frame and reloaded from the period, which changes only when the
+        # adaptive stride is recomputed (`_set_detect_stride`)
+        self._det_period = int(self._detect_stride_dyn)
+        self._det_countdown = 1
+        self.state.detect_stride = self._det_period
         # Legacy HOG-related dynamic parameters removed
         self._exp_mean_ema = 0.0
         self._exp_low_clip_ema = 0.0
         self._exp_high_clip_ema = 0.0
+        # Exposure analysis runs every K frames; one EMA update with
+        # alpha_k = 1-(1-alpha)^K converges like K per-frame updates, and the
+        # same closed form keeps enhancement blending on its original curve
+        _exp_k = max(1, int(self.config.EXP_ANALYZE_EVERY_N_FRAMES))
+        self._exp_alpha_k = 1.0 - (1.0 - float(self.config.EXP_EMA_ALPHA)) ** _exp_k
+        self._enh_blend_k = 1.0 - (1.0 - float(self.config.ENHANCE_BLEND_ALPHA)) ** _exp_k
+        self._exp_countdown = 1
         # Enhancement parameters (contrast/brightness) applied when exposure is poor
         self._enh_alpha: float = 1.0
         self._enh_beta: float = 0.0
@@ -82,6 +238,11 @@ class SecurityCamService:
         self._shutter_us: int = int(getattr(self.config, "SHUTTER_BASE_US", 10_000))
         self._shutter_last_update: float = 0.0
         self._manual_exposure: bool = False
+        # Camera capability flags; resolved once after the camera starts so the
+        # per-frame adjustment paths avoid repeated hasattr/getattr lookups
+        self._cap_ev: bool = False
+        self._cap_gain: bool = False
+        self._cap_shutter: bool = False
         # NOIR color correction removed; always convert to mono in service when profile=noir
         # Face detection debounce (removed with non-motion detectors)
         # Motion-backend adjustment cadence and pause window
@@ -89,6 +250,9 @@ class SecurityCamService:
         self._adjust_pause_until: float = 0.0
         self._seed_at_resume: bool = False
         self._last_frame_ts: float = 0.0
+        # Monotonic mirror of the last detection time for cooldown checks;
+        # state.last_detection_ts stays wall-clock for the UI/API
+        self._last_detection_mono: float = 0.0
         # Initialize public state mirrors
         self.state.ev_bias = float(self._ev_bias)
         self.state.gain = float(self._gain_value)
@@ -96,64 +260,180 @@ class SecurityCamService:
 
     # Public API
     def start(self) -> None:
-        """Start background thread (camera starts inside thread)."""
+        """Start capture and detection threads (camera starts inside thread)."""
+        gil_check = getattr(sys, "_is_gil_enabled", None)
+        if gil_check is not None and not gil_check():
+            print("[secam] Free-threaded CPython: capture and detection run in parallel", flush=True)
         self._thread = threading.Thread(target=self._run, daemon=True)
         self._thread.start()
+        self._detect_thread = threading.Thread(target=self._detect_run, daemon=True)
+        self._detect_thread.start()
+        self._save_thread = threading.Thread(target=self._save_run, daemon=True)
+        self._save_thread.start()
+        self._encode_thread = threading.Thread(target=self._encode_run, daemon=True)
+        self._encode_thread.start()
 
     def stop(self) -> None:
         """Request shutdown and release camera resources."""
         self._stop.set()
+        self._detect_event.set()  # Wake the detection worker so it can exit
         if self._thread and self._thread.is_alive():
             self._thread.join(timeout=2)
+        if self._detect_thread and self._detect_thread.is_alive():
+            self._detect_thread.join(timeout=2)
+        if self._save_thread and self._save_thread.is_alive():
+            self._save_thread.join(timeout=2)
+        if self._encode_thread and self._encode_thread.is_alive():
+            self._encode_thread.join(timeout=2)
         self.camera.stop()
 
     def get_latest_frame(self) -> Optional[np.ndarray]:
-        """Return a copy of the most recent frame, or None."""
-        with self._frame_lock:
-            if self._latest_frame is None:
-                return None
-            return self._latest_frame.copy()
+        """Return the most recent frame (read-only; do not mutate), or None."""
+        idx = self._ready_idx
+        if idx < 0:
+            return None
+        return self._frames[idx]
+
+    def wait_for_frame(self, timeout: float) -> bool:
+        """Block until the capture loop publishes a frame, or the timeout.
+
+        Returns:
+          True when woken by a new frame, False on timeout.
+        """
+        with self._new_frame:
+            return self._new_frame.wait(timeout)
+
+    def get_latest_jpeg(self, quality: int) -> tuple:
+        """Return `(seq, jpeg_bytes)` for the latest frame; `(0, None)` if none.
+
+        Serves the encoder worker's prebuilt bytes when they are current.
+        The first request after an idle period encodes inline and primes the
+        cache; subsequent requests (and other concurrent viewers at the same
+        quality) read shared bytes.
+        """
+        seq, frame = self.get_latest()
+        if frame is None:
+            return 0, None
+        with self._jpeg_lock:
+            self._jpeg_demand[quality] = time.monotonic()
+            hit = self._jpeg_cache.get(quality)
+            if hit is not None and hit[0] == seq:
+                return seq, hit[1]
+        body = _encode_jpeg(frame, quality)
+        if body is None:
+            return seq, None
+        with self._jpeg_lock:
+            self._jpeg_cache[quality] = (seq, body)
+        return seq, body
+
+    def _encode_run(self) -> None:
+        """Encoder worker: keep latest-frame JPEGs pre-built while in demand.
+
+        Wakes once per captured frame and refreshes the cached encode for
+        each quality requested within the last few seconds, so request
+        threads never encode while viewers are actively polling. With no
+        recent demand the loop just waits on the frame condition.
+        """
+        while not self._stop.is_set():
+            if not self.wait_for_frame(0.5):
+                continue
+            now = time.monotonic()
+            with self._jpeg_lock:
+                wanted = [q for q, ts in self._jpeg_demand.items() if now - ts <= 5.0]
+            if not wanted:
+                continue
+            seq, frame = self.get_latest()
+            if frame is None:
+                continue
+            for q in wanted:
+                with self._jpeg_lock:
+                    hit = self._jpeg_cache.get(q)
+                if hit is not None and hit[0] == seq:
+                    continue
+                body = _encode_jpeg(frame, q)
+                if body is not None:
+                    with self._jpeg_lock:
+                        self._jpeg_cache[q] = (seq, body)
+
+    def get_latest(self) -> tuple:
+        """Return `(seq, frame)` for the most recent frame; `(0, None)` if none.
+
+        The sequence number increments once per published frame and is read
+        from the same buffer slot as the frame, so callers can key caches on
+        it (e.g. to skip re-encoding a frame they have already served).
+        """
+        idx = self._ready_idx
+        if idx < 0:
+            return 0, None
+        return self._frame_seqs[idx], self._frames[idx]
 
     def get_status(self) -> ServiceState:
-        """Return the current service state snapshot."""
-        return self.state
+        """Return a copy of the current service state.
+
+        Copying gives API readers a consistent snapshot: the capture and
+        detection threads keep mutating `self.state`, and handing out the
+        live object would let a response observe a half-updated frame.
+        """
+        return replace(self.state)
 
     def list_latest_images(self, limit: int) -> List[str]:
-        """List newest saved images up to `limit` (absolute paths)."""
-        try:
-            files = [
-                os.path.join(self.config.SAVE_DIR, f)
-                for f in os.listdir(self.config.SAVE_DIR)
-                if f.lower().endswith(".jpg")
-            ]
-        except FileNotFoundError:
-            return []
-        files.sort(key=lambda p: os.path.getmtime(p), reverse=True)
-        return files[:limit]
+        """List newest saved image basenames up to `limit`, newest first.
+
+        Served from the in-memory listing maintained by the writer thread,
+        so web requests cost a list slice instead of a directory scan.
+        """
+        return self._recent_names[:limit]
+
+    def list_all_images(self) -> List[str]:
+        """List all saved image basenames, newest first (for the gallery)."""
+        return self._recent_names[:]
 
     # Internal
     def _run(self) -> None:
         """Worker loop: read frames, adapt, detect, save, repeat."""
-        frame_idx = 0
         frame_interval = 1.0 / max(1, self.config.CAPTURE_FPS)
-        next_frame_ts = time.time()
+        next_frame_ts = time.monotonic()
+        # Hoist immutable config lookups out of the per-frame loop
+        cfg = self.config
+        rot_code = self._rot_code
+        is_noir = cfg.CAMERA_PROFILE == "noir"
+        seed_after_idle = float(cfg.SEED_AFTER_IDLE_SEC)
+        exp_every = max(1, int(cfg.EXP_ANALYZE_EVERY_N_FRAMES))
+        use_opencl = self._use_opencl
+        # Fused host preprocess (rotate+mono+enhance+stats in one pass):
+        # selected once for the configurations the kernel specializes for
+        fused = None
+        fused_rot180 = rot_code == cv2.ROTATE_180
+        if preprocess_mono is not None and is_noir and not use_opencl and rot_code in (None, cv2.ROTATE_180):
+            fused = preprocess_mono
         # Initialize camera here so Flask can start even if camera blocks
         started = False
         while not self._stop.is_set():
-            # Pace the loop to respect CAPTURE_FPS precisely, regardless of processing time
-            now_loop = time.time()
-            if now_loop < next_frame_ts:
-                time.sleep(min(0.1, next_frame_ts - now_loop))
-                continue
+            # One monotonic read per iteration: reused for pacing, idle-gap
+            # seeding, pause windows, and cooldown checks below. Monotonic is
+            # cheaper than wall time and immune to NTP/clock steps.
+            now = time.monotonic()
+            # Pace the loop to respect CAPTURE_FPS precisely, regardless of
+            # processing time. One interruptible wait covers the whole gap to
+            # the deadline (no chunked wakeups) and returns early on stop.
+            if now < next_frame_ts:
+                if self._stop.wait(next_frame_ts - now):
+                    break
+                now = time.monotonic()
             # Schedule next frame time; if we fell behind, reset to avoid bursts
             next_frame_ts += frame_interval
-            if next_frame_ts < now_loop:
-                next_frame_ts = now_loop + frame_interval
+            if next_frame_ts < now:
+                next_frame_ts = now + frame_interval
             if not started:
                 try:
                     self.camera.start()
                     print("[secam] Camera started (backend=%s)" % self.config.CAMERA_BACKEND, flush=True)
                     started = True
+                    # Resolve camera control capabilities once for the hot path
+                    cam = self.camera
+                    self._cap_ev = bool(getattr(cam, "supports_ev", None)) and cam.supports_ev()
+                    self._cap_gain = bool(getattr(cam, "supports_gain", None)) and cam.supports_gain()
+                    self._cap_shutter = bool(getattr(cam, "supports_shutter", None)) and cam.supports_shutter()
                 except Exception as e:
                     print(f"[secam] Camera start failed: {e}", flush=True)
                     time.sleep(3.0)
@@ -163,26 +443,56 @@ class SecurityCamService:
                 time.sleep(0.01)
                 continue
             # Seed after idle/no-frame gaps to avoid stale baseline
-            now_frame = time.time()
-            if self._last_frame_ts and (now_frame - self._last_frame_ts) > float(self.config.SEED_AFTER_IDLE_SEC):
+            if self._last_frame_ts and (now - self._last_frame_ts) > seed_after_idle:
                 try:
                     self.detector.reset()
                 except Exception:
                     pass
                 self._seed_at_resume = True
-            self._last_frame_ts = now_frame
+            self._last_frame_ts = now
 
+            exp_gray = None  # Gray plane reused by exposure analysis when available
+            # Triple-buffer slot this iteration will publish into; scratch
+            # buffers are keyed by it so in-flight borrows stay untouched
+            slot = (self._ready_idx + 1) % 3
+            uframe = None
+            on_gpu = False
+            fstats = None
+            if fused is not None:
+                # One pass reads each source pixel once and writes the final
+                # rotated+enhanced mono frame once, returning raw-luma stats
+                # as a byproduct; the OpenCV chain below is the fallback
+                mono = self._mono_bufs[slot]
+                if mono is None or mono.shape != frame.shape:
+                    mono = self._mono_bufs[slot] = np.empty_like(frame)
+                else:
+                    mono.flags.writeable = True  # Reclaim: slot has wrapped around
+                try:
+                    fstats = fused(frame, mono, self._enh_alpha, self._enh_beta, fused_rot180)
+                    frame = mono
+                except Exception:
+                    fstats = None
+            if fstats is None and use_opencl:
+                # T-API path: rotation and NOIR mono rendering stay on the
+                # OpenCL device; only the final result is downloaded
+                try:
+                    uframe = cv2.UMat(frame)
+                    if rot_code is not None:
+                        uframe = cv2.rotate(uframe, rot_code)
+                    if is_noir:
+                        uframe = cv2.cvtColor(cv2.cvtColor(uframe, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR)
+                    frame = uframe.get()
+                    on_gpu = True
+                except Exception:
+                    uframe = None
+
+            # Host path (also the fallback if the fused/OpenCL pass failed)
             # Apply fixed rotation (e.g., for upside-down installation)
-            rot = int(self.config.ROTATE_DEGREES)
-            if rot == 180:
-                frame = cv2.rotate(frame, cv2.ROTATE_180)
-            elif rot == 90:
-                frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
-            elif rot == 270:
-                frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
+            if fstats is None and not on_gpu and rot_code is not None:
+                frame = cv2.rotate(frame, rot_code)
 
             # If using NOIR profile, render mono for stable detection/appearance under IR.
-            if self.config.CAMERA_PROFILE == "noir":
+            if fstats is None and not on_gpu and is_noir:
                 try:
                     # Prefer camera luma (Y) when available to avoid extra conversion
                     y = None
@@ -194,105 +504,314 @@ class SecurityCamService:
                     if y is not None:
                         gray = y
                         # Apply the same rotation to luma as we applied to the frame
-                        if rot == 180:
-                            gray = cv2.rotate(gray, cv2.ROTATE_180)
-                        elif rot == 90:
-                            gray = cv2.rotate(gray, cv2.ROTATE_90_CLOCKWISE)
-                        elif rot == 270:
-                            gray = cv2.rotate(gray, cv2.ROTATE_90_COUNTERCLOCKWISE)
+                        if rot_code is not None:
+                            gray = cv2.rotate(gray, rot_code)
+                    else:
+                        gbuf = self._gray_buf
+                        if gbuf is None or gbuf.shape != frame.shape[:2]:
+                            gbuf = self._gray_buf = np.empty(frame.shape[:2], np.uint8)
+                        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gbuf)
+                    # Replicate luma into the slot's mono buffer instead of a
+                    # fresh GRAY2BGR conversion: no per-frame allocation
+                    mono = self._mono_bufs[slot]
+                    if mono is None or mono.shape[:2] != gray.shape:
+                        mono = self._mono_bufs[slot] = np.empty(gray.shape + (3,), np.uint8)
                     else:
-                        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                    frame = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+                        mono.flags.writeable = True  # Reclaim: slot has wrapped around
+                    frame = cv2.merge((gray, gray, gray), dst=mono)
+                    exp_gray = gray
                 except Exception:
                     pass
 
-            # exposure analysis and adaptive sensitivity (also selects enhancement)
-            self._update_exposure_and_adapt(frame)
+            # exposure analysis and adaptive sensitivity (also selects
+            # enhancement); runs every Kth frame since brightness moves slowly
+            self._exp_countdown -= 1
+            if self._exp_countdown <= 0:
+                self._exp_countdown = exp_every
+                self._update_exposure_and_adapt(frame, now, exp_gray, fstats)
 
-            # Optionally enhance frame when under/over exposed
+            # Optionally enhance frame when under/over exposed (the fused
+            # kernel has already applied the current enhancement parameters)
             proc = frame
-            if abs(self._enh_alpha - 1.0) > 1e-3 or abs(self._enh_beta) > 1e-3:
+            if fstats is None and (abs(self._enh_alpha - 1.0) > 1e-3 or abs(self._enh_beta) > 1e-3):
                 try:
-                    proc = cv2.convertScaleAbs(frame, alpha=self._enh_alpha, beta=self._enh_beta)
+                    if on_gpu and uframe is not None:
+                        proc = cv2.convertScaleAbs(uframe, alpha=self._enh_alpha, beta=self._enh_beta).get()
+                    else:
+                        # Scale into the slot's preallocated buffer: enhancement
+                        # otherwise allocates a fresh HxWx3 image every frame
+                        enh = self._enh_bufs[slot]
+                        if enh is None or enh.shape != frame.shape:
+                            enh = self._enh_bufs[slot] = np.empty_like(frame)
+                        else:
+                            enh.flags.writeable = True  # Reclaim: slot has wrapped around
+                        proc = cv2.convertScaleAbs(frame, dst=enh, alpha=self._enh_alpha, beta=self._enh_beta)
                 except Exception:
                     proc = frame
 
-            # store latest (processed) frame
-            with self._frame_lock:
-                self._latest_frame = proc
+            # Publish latest (processed) frame into the next triple-buffer
+            # slot. Mark it read-only first: readers borrow the array without
+            # copying, so nothing may mutate it after publication.
+            try:
+                proc.flags.writeable = False
+            except ValueError:
+                pass  # e.g. a view whose base is shared; still safe to serve
+            self._frame_seq += 1
+            self._frames[slot] = proc
+            self._frame_seqs[slot] = self._frame_seq
+            self._ready_idx = slot
+            with self._new_frame:
+                self._new_frame.notify_all()
             self.state.total_frames += 1
 
             # schedule status
             self.state.armed = self.schedule.is_active_now()
 
-            self.state.detect_stride = int(self._detect_stride_dyn)
-            self.state.hit_threshold = 0.0
+            # detection throttling (cadence may be adapted by exposure):
+            # qualifying frames are handed to the detection worker so the
+            # capture loop never blocks on detect or JPEG saving. The
+            # countdown avoids a modulo and stride re-read on every frame.
+            self._det_countdown -= 1
+            if self._det_countdown <= 0:
+                self._det_countdown = self._det_period
+                self._detect_inbox = (proc, now)
+                self._detect_event.set()
+
+    def _detect_run(self) -> None:
+        """Detection worker loop: consume the latest handed-off frame.
+
+        The inbox holds at most one frame; if detection falls behind, the
+        capture loop simply overwrites it with a newer frame, so the worker
+        always operates on fresh data and never builds a backlog.
+        """
+        save_on_detect = self.config.SAVE_ON_DETECT
+        alert_cooldown = float(self.config.ALERT_COOLDOWN_SEC)
+        batch_size = max(1, int(self.config.DETECT_BATCH_SIZE))
+        batch_timeout = float(self.config.DETECT_BATCH_TIMEOUT_SEC)
+        batch: List[tuple] = []
+        batch_deadline = 0.0
+        while not self._stop.is_set():
+            if not self._detect_event.wait(0.5):
+                # No new frame: flush a partial batch once its deadline
+                # passes rather than holding it until more frames qualify
+                if batch and time.monotonic() >= batch_deadline:
+                    items, batch = batch, []
+                    self._detection_tick_batch(items, save_on_detect, alert_cooldown)
+                continue
+            self._detect_event.clear()
+            item = self._detect_inbox
+            self._detect_inbox = None
+            if item is None:
+                continue
+            if batch_size <= 1:
+                proc, now = item
+                self._detection_tick(proc, now, save_on_detect, alert_cooldown)
+                continue
+            proc, now = item
+            # Copy on accumulation: the frame is a borrowed triple-buffer
+            # slot that the capture loop reclaims and rewrites once the ring
+            # wraps, and a batched frame must outlive that wrap (the raw-save
+            # path copies on enqueue for the same reason)
+            batch.append((proc.copy(), now))
+            if len(batch) == 1:
+                batch_deadline = time.monotonic() + batch_timeout
+            if len(batch) < batch_size and time.monotonic() < batch_deadline:
+                continue
+            items, batch = batch, []
+            self._detection_tick_batch(items, save_on_detect, alert_cooldown)
+
+    def _detection_tick(self, proc: np.ndarray, now: float, save_on_detect: bool, alert_cooldown: float) -> None:
+        """Run one seed/detect/save cycle for a frame from the capture loop.
+
+        Args:
+          proc: Processed (published) frame; treated read-only.
+          now: Monotonic timestamp taken when the frame was captured.
+          save_on_detect: Hoisted Config.SAVE_ON_DETECT.
+          alert_cooldown: Hoisted Config.ALERT_COOLDOWN_SEC.
+        """
+        detections = []
+        # Pause motion detection during scheduled camera adjustments
+        paused_for_adjust = (
+            self._detector_backend == "motion" and now < self._adjust_pause_until
+        )
+        # If pause window ended and we owe a seed, seed now and skip this detection tick
+        seeded_now = False
+        if self._seed_at_resume and not paused_for_adjust:
+            try:
+                self.detector.seed(proc)
+            except Exception:
+                pass
+            self._seed_at_resume = False
+            seeded_now = True
 
-            # detection throttling (cadence may be adapted by exposure)
-            if frame_idx % max(1, int(self._detect_stride_dyn)) == 0:
+        if self.state.armed and not paused_for_adjust and not seeded_now:
+            try:
+                detections = self.detector.detect(proc)
+            except Exception as e:
+                # Never let detection errors kill the worker loop
+                print(f"[secam] Detection error: {e}", flush=True)
                 detections = []
-                # Pause motion detection during scheduled camera adjustments
-                paused_for_adjust = (
-                    self._detector_backend == "motion" and time.time() < self._adjust_pause_until
-                )
-                # If pause window ended and we owe a seed, seed now and skip this detection tick
-                seeded_now = False
-                if self._seed_at_resume and not paused_for_adjust:
-                    try:
-                        self.detector.seed(proc)
-                    except Exception:
-                        pass
-                    self._seed_at_resume = False
-                    seeded_now = True
+            if detections:
+                self._apply_detections(proc, detections, now, save_on_detect)
+        # cooldown / idle state
+        if not detections:
+            self._maybe_clear_alert(now, alert_cooldown)
 
-                if self.state.armed and not paused_for_adjust and not seeded_now:
-                    try:
-                        detections = self.detector.detect(proc)
-                    except Exception as e:
-                        # Never let detection errors kill the capture loop
-                        print(f"[secam] Detection error: {e}", flush=True)
-                        detections = []
-                    if detections:
-                        self.state.detecting = True
-                        self.state.last_detection_ts = time.time()
-                        # Update counts and kinds for UI/API
-                        persons = sum(1 for d in detections if getattr(d, "kind", "person") == "person")
-                        faces = sum(1 for d in detections if getattr(d, "kind", "") == "face")
-                        kinds = []
-                        if persons:
-                            kinds.append("person")
-                        if faces:
-                            kinds.append("face")
-                        self.state.person_count = persons
-                        self.state.face_count = faces
-                        self.state.last_kinds = kinds
-                        if self.config.SAVE_ON_DETECT:
-                            self._maybe_save_frame(proc, detections)
-                # cooldown / idle state
-                if not detections:
-                    if time.time() - self.state.last_detection_ts > self.config.ALERT_COOLDOWN_SEC:
-                        self.state.detecting = False
-                        self.state.person_count = 0
-                        self.state.face_count = 0
-                        self.state.last_kinds = []
-                        pass
+    def _detection_tick_batch(self, items: List[tuple], save_on_detect: bool, alert_cooldown: float) -> None:
+        """Run one seed/detect/save cycle over an accumulated frame batch.
+
+        The whole batch advances the differencing baseline through
+        `detector.detect_batch`; the newest frame that shows motion drives the
+        alert state and saving, so accumulating does not drop events from
+        earlier frames in the batch.
+
+        Args:
+          items: `(frame, now)` tuples in capture order.
+          save_on_detect: Hoisted Config.SAVE_ON_DETECT.
+          alert_cooldown: Hoisted Config.ALERT_COOLDOWN_SEC.
+        """
+        proc, now = items[-1]
+        paused_for_adjust = (
+            self._detector_backend == "motion" and now < self._adjust_pause_until
+        )
+        seeded_now = False
+        if self._seed_at_resume and not paused_for_adjust:
+            try:
+                self.detector.seed(proc)
+            except Exception:
+                pass
+            self._seed_at_resume = False
+            seeded_now = True
+
+        detections = []
+        if self.state.armed and not paused_for_adjust and not seeded_now:
+            try:
+                results = self.detector.detect_batch([f for f, _ in items])
+            except Exception as e:
+                print(f"[secam] Detection error: {e}", flush=True)
+                results = []
+            # Pick the newest frame with motion to drive state and saving
+            for (f, ts), dets in zip(reversed(items), reversed(results)):
+                if dets:
+                    proc, now, detections = f, ts, dets
+                    break
+            if detections:
+                self._apply_detections(proc, detections, now, save_on_detect)
+        if not detections:
+            self._maybe_clear_alert(now, alert_cooldown)
+
+    def _apply_detections(self, proc: np.ndarray, detections: List, now: float, save_on_detect: bool) -> None:
+        """Mirror detections into state and save the frame if configured."""
+        self.state.detecting = True
+        self.state.last_detection_ts = time.time()
+        self._last_detection_mono = now
+        # Update counts and kinds for UI/API; one pass over the detections
+        # instead of one generator scan per kind
+        by_kind = Counter(getattr(d, "kind", "person") for d in detections)
+        persons = by_kind["person"]
+        faces = by_kind["face"]
+        kinds = []
+        if persons:
+            kinds.append("person")
+        if faces:
+            kinds.append("face")
+        self.state.person_count = persons
+        self.state.face_count = faces
+        self.state.last_kinds = kinds
+        if save_on_detect:
+            self._maybe_save_frame(proc, detections, now)
+
+    def _maybe_clear_alert(self, now: float, alert_cooldown: float) -> None:
+        """Reset detection state once the alert cooldown has elapsed."""
+        if now - self._last_detection_mono > alert_cooldown:
+            self.state.detecting = False
+            self.state.person_count = 0
+            self.state.face_count = 0
+            self.state.last_kinds = []
+
+    def _set_detect_stride(self, stride: int) -> None:
+        """Update the detection stride, its countdown, and the state mirror.
 
-            frame_idx += 1
+        No-op when the stride is unchanged, so the per-frame path in `_run`
+        never re-reads or re-converts the stride value.
+        """
+        stride = max(1, int(stride))
+        if stride == self._det_period:
+            return
+        self._detect_stride_dyn = stride
+        self._det_period = stride
+        self.state.detect_stride = stride
+        if self._det_countdown > stride:
+            self._det_countdown = stride
+
+    def _update_exposure_and_adapt(
+        self,
+        frame: np.ndarray,
+        now: float,
+        gray: Optional[np.ndarray] = None,
+        stats: Optional[tuple] = None,
+    ) -> None:
+        """Update exposure metrics and adjust sensitivity/cadence accordingly.
 
-    def _update_exposure_and_adapt(self, frame: np.ndarray) -> None:
-        """Update exposure metrics and adjust sensitivity/cadence accordingly."""
+        Args:
+          frame: Current BGR frame.
+          now: Monotonic timestamp read once per loop iteration in `_run`.
+          gray: Optional gray plane already derived for this frame (NOIR luma);
+            analyzed directly when given to skip the BGR round-trip.
+          stats: Optional `(mean, low_clip, high_clip)` already computed for
+            this frame (e.g. by the fused preprocess kernel); used as-is.
+        """
         if not self.config.ADAPTIVE_SENSITIVITY:
             self.state.exposure_state = "off"
-            self._detect_stride_dyn = self._detect_stride_base
+            self._set_detect_stride(self._detect_stride_base)
+            return
+        if stats is not None:
+            mean, low_clip, high_clip = stats
+            self._adapt_from_stats(float(mean), float(low_clip), float(high_clip), now)
             return
-        # Compute metrics
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        mean = float(gray.mean())
-        # Use tight thresholds for clip percentages
-        low_clip = float((gray <= 5).mean())
-        high_clip = float((gray >= 250).mean())
-        # EMA to stabilize (configurable smoothing factor)
-        alpha = float(self.config.EXP_EMA_ALPHA)
+        # Only scalar statistics are needed, so subsample the frame first:
+        # uniform stride slicing keeps mean/clip fractions unbiased while
+        # touching a fraction of the pixels (memory-bound, so near-linear win)
+        step = max(1, int(self.config.EXP_SAMPLE_STEP))
+        if gray is not None:
+            # A luma plane already exists for this frame: analyze it directly
+            gsample = gray[::step, ::step] if step > 1 else gray
+            if exposure_stats_gray is not None:
+                mean, low_clip, high_clip = exposure_stats_gray(gsample)
+                mean = float(mean)
+                low_clip = float(low_clip)
+                high_clip = float(high_clip)
+            else:
+                mean, low_clip, high_clip = _hist_stats(np.ascontiguousarray(gsample))
+        else:
+            sample = frame[::step, ::step] if step > 1 else frame
+            if exposure_stats_bgr is not None:
+                # Fused Numba kernel: luma + mean + clip counts in one pass
+                # over the BGR bytes, no gray-plane or histogram temporaries
+                mean, low_clip, high_clip = exposure_stats_bgr(sample)
+                mean = float(mean)
+                low_clip = float(low_clip)
+                high_clip = float(high_clip)
+            else:
+                # Compute metrics from a single calcHist pass. The green
+                # channel is a cheap luminance proxy (single plane copy vs a
+                # weighted conversion) and suffices for exposure statistics.
+                if self.config.EXPOSURE_GRAY_MODE == "green":
+                    plane = np.ascontiguousarray(sample[:, :, 1])
+                else:
+                    plane = cv2.cvtColor(np.ascontiguousarray(sample), cv2.COLOR_BGR2GRAY)
+                mean, low_clip, high_clip = _hist_stats(plane)
+        self._adapt_from_stats(mean, low_clip, high_clip, now)
+
+    def _adapt_from_stats(self, mean: float, low_clip: float, high_clip: float, now: float) -> None:
+        """Advance the exposure EMAs and adapt sensitivity/enhancement.
+
+        Shared tail of `_update_exposure_and_adapt`: callers provide the raw
+        per-frame statistics, whether sampled here or produced as a byproduct
+        of the fused preprocess kernel.
+        """
+        # EMA to stabilize; alpha is pre-advanced for the analysis cadence
+        alpha = self._exp_alpha_k
         self._exp_mean_ema = (1 - alpha) * self._exp_mean_ema + alpha * mean
         self._exp_low_clip_ema = (1 - alpha) * self._exp_low_clip_ema + alpha * low_clip
         self._exp_high_clip_ema = (1 - alpha) * self._exp_high_clip_ema + alpha * high_clip
@@ -318,15 +837,12 @@ class SecurityCamService:
 
         # Adapt parameters
         if exp_state in ("over", "under"):
-            # No-op for motion backend
-            self._detect_stride_dyn = int(max(1, self._detect_stride_base * self.config.ADAPT_DETECT_STRIDE_SCALE))
+            self._set_detect_stride(int(max(1, self._detect_stride_base * self.config.ADAPT_DETECT_STRIDE_SCALE)))
         else:
-            # No-op for motion backend
-            self._detect_stride_dyn = self._detect_stride_base
+            self._set_detect_stride(self._detect_stride_base)
 
         # Choose enhancement target with hold + blend to avoid flicker
         target_alpha, target_beta = 1.0, 0.0
-        now = time.time()
         if exp_state == "under" and self.config.ENHANCE_ON_UNDER:
             target_alpha = float(self.config.ENHANCE_UNDER_ALPHA)
             target_beta = float(self.config.ENHANCE_UNDER_BETA)
@@ -339,20 +855,19 @@ class SecurityCamService:
             # Normal: if within hold window, keep previous target
             if now < self._enh_hold_until:
                 target_alpha, target_beta = self._enh_tgt_alpha, self._enh_tgt_beta
-        # Blend current toward target
-        blend = float(self.config.ENHANCE_BLEND_ALPHA)
+        # Blend current toward target; pre-advanced for the analysis cadence
+        blend = self._enh_blend_k
         self._enh_tgt_alpha, self._enh_tgt_beta = target_alpha, target_beta
         self._enh_alpha = (1.0 - blend) * self._enh_alpha + blend * target_alpha
         self._enh_beta = (1.0 - blend) * self._enh_beta + blend * target_beta
 
         # Decide whether to run camera-side adjustments now
         run_adjust = False
-        now2 = time.time()
         if self._detector_backend == "motion":
             # 1) Periodic adjust window with brief pause to avoid false detections
-            if now2 - self._adjust_last_ts >= float(self.config.MOTION_ADJUST_PERIOD_SEC):
-                self._adjust_last_ts = now2
-                self._adjust_pause_until = now2 + float(self.config.MOTION_ADJUST_PAUSE_SEC)
+            if now - self._adjust_last_ts >= float(self.config.MOTION_ADJUST_PERIOD_SEC):
+                self._adjust_last_ts = now
+                self._adjust_pause_until = now + float(self.config.MOTION_ADJUST_PAUSE_SEC)
                 try:
                     self.detector.reset()
                 except Exception:
@@ -360,7 +875,7 @@ class SecurityCamService:
                 self._seed_at_resume = True
                 run_adjust = True
             # 2) While paused, continue adjustments to let controls converge
-            elif now2 < self._adjust_pause_until:
+            elif now < self._adjust_pause_until:
                 run_adjust = True
             else:
                 run_adjust = False
@@ -370,21 +885,21 @@ class SecurityCamService:
             # avoid comparing against pre-step baseline. This ensures continued
             # progress even if a prior window failed to trigger again.
             if not run_adjust and (self.state.exposure_state in ("under", "over")):
-                need_ev = (
-                    getattr(self, "_ev_last_update", 0.0) == 0.0 or
-                    (now2 - getattr(self, "_ev_last_update", 0.0)) >= float(self.config.AE_EV_UPDATE_INTERVAL_SEC)
-                ) and getattr(self.camera, "supports_ev", lambda: False)()
-                need_gain = (
-                    getattr(self, "_gain_last_update", 0.0) == 0.0 or
-                    (now2 - getattr(self, "_gain_last_update", 0.0)) >= float(self.config.GAIN_UPDATE_INTERVAL_SEC)
-                ) and getattr(self.camera, "supports_gain", lambda: False)()
-                need_shutter = (
-                    getattr(self, "_shutter_last_update", 0.0) == 0.0 or
-                    (now2 - getattr(self, "_shutter_last_update", 0.0)) >= float(self.config.SHUTTER_UPDATE_INTERVAL_SEC)
-                ) and getattr(self.camera, "supports_shutter", lambda: False)()
+                need_ev = self._cap_ev and (
+                    self._ev_last_update == 0.0 or
+                    (now - self._ev_last_update) >= float(self.config.AE_EV_UPDATE_INTERVAL_SEC)
+                )
+                need_gain = self._cap_gain and (
+                    self._gain_last_update == 0.0 or
+                    (now - self._gain_last_update) >= float(self.config.GAIN_UPDATE_INTERVAL_SEC)
+                )
+                need_shutter = self._cap_shutter and (
+                    self._shutter_last_update == 0.0 or
+                    (now - self._shutter_last_update) >= float(self.config.SHUTTER_UPDATE_INTERVAL_SEC)
+                )
                 if need_ev or need_gain or need_shutter:
                     # Use the configured pause length to keep semantics consistent
-                    self._adjust_pause_until = now2 + float(self.config.MOTION_ADJUST_PAUSE_SEC)
+                    self._adjust_pause_until = now + float(self.config.MOTION_ADJUST_PAUSE_SEC)
                     try:
                         self.detector.reset()
                     except Exception:
@@ -393,35 +908,26 @@ class SecurityCamService:
                     run_adjust = True
 
         if run_adjust:
-            # Try to adjust camera EV-bias (Picamera2 only) to help AE converge
-            self._maybe_adjust_ev(exp_state)
-            # Try to adjust analogue gain (Picamera2) to brighten/darken
-            self._maybe_adjust_gain(exp_state)
-            # Try to adjust shutter time up to 1s if very dark
-            self._maybe_adjust_shutter(exp_state)
+            # Apply any EV/gain/shutter steps in one batched camera call
+            self._apply_camera_adjustments(exp_state, now)
         # Mirror current camera controls into state for UI/API
-        self.state.ev_bias = float(getattr(self, "_ev_bias", 0.0))
-        self.state.gain = float(getattr(self, "_gain_value", 0.0))
-        self.state.shutter_us = int(getattr(self, "_shutter_us", 0))
+        self.state.ev_bias = float(self._ev_bias)
+        self.state.gain = float(self._gain_value)
+        self.state.shutter_us = int(self._shutter_us)
 
-    def _maybe_adjust_ev(self, exp_state: str) -> None:
-        """Adapt camera exposure bias (EV) if supported and enabled.
+    def _plan_ev_adjust(self, exp_state: str, now: float) -> Optional[float]:
+        """Return a new EV-bias target, or None if no change is due.
 
         Args:
           exp_state: 'over' | 'under' | 'normal' | 'off'
+          now: Current timestamp shared by all planners this tick.
         """
-        if not self.config.AE_EV_ADAPT_ENABLE:
-            return
-        # Only Picamera2 implements set_ev; guard via duck-typing
-        if not hasattr(self.camera, "set_ev") or not getattr(self.camera, "supports_ev")():
-            return
-        now = time.time()
-        # Be defensive in case fields were not initialized yet
-        last_update = getattr(self, "_ev_last_update", 0.0)
-        if now - last_update < float(self.config.AE_EV_UPDATE_INTERVAL_SEC):
-            return  # Too soon to update again
+        if not self.config.AE_EV_ADAPT_ENABLE or not self._cap_ev:
+            return None
+        if now - self._ev_last_update < float(self.config.AE_EV_UPDATE_INTERVAL_SEC):
+            return None  # Too soon to update again
 
-        ev = float(getattr(self, "_ev_bias", 0.0))
+        ev = float(self._ev_bias)
         if exp_state == "under":
             ev = min(self.config.AE_EV_MAX, ev + float(self.config.AE_EV_STEP))
         elif exp_state == "over":
@@ -434,37 +940,25 @@ class SecurityCamService:
             elif ev < 0:
                 ev = min(0.0, ev + step)
         else:
-            return
+            return None
 
-        if abs(ev - getattr(self, "_ev_bias", 0.0)) < 1e-6:
-            return  # No change
-        if self.camera.set_ev(ev):
-            self._ev_bias = ev
-            self._ev_last_update = now
-            # Reseed around significant camera control changes to avoid false triggers
-            try:
-                self._adjust_pause_until = now + float(self.config.MOTION_ADJUST_PAUSE_SEC)
-                self.detector.reset()
-                self._seed_at_resume = True
-            except Exception:
-                pass
+        if abs(ev - self._ev_bias) < 1e-6:
+            return None  # No change
+        return ev
 
-    def _maybe_adjust_gain(self, exp_state: str) -> None:
-        """Adapt analogue gain if supported and enabled.
+    def _plan_gain_adjust(self, exp_state: str, now: float) -> Optional[float]:
+        """Return a new analogue gain target, or None if no change is due.
 
         Args:
           exp_state: 'over' | 'under' | 'normal' | 'off'
+          now: Current timestamp shared by all planners this tick.
         """
-        if not self.config.GAIN_ADAPT_ENABLE:
-            return
-        if not hasattr(self.camera, "set_gain") or not getattr(self.camera, "supports_gain")():
-            return
-        now = time.time()
-        last = getattr(self, "_gain_last_update", 0.0)
-        if now - last < float(self.config.GAIN_UPDATE_INTERVAL_SEC):
-            return
+        if not self.config.GAIN_ADAPT_ENABLE or not self._cap_gain:
+            return None
+        if now - self._gain_last_update < float(self.config.GAIN_UPDATE_INTERVAL_SEC):
+            return None
 
-        g = float(getattr(self, "_gain_value", float(self.config.GAIN_MIN)))
+        g = float(self._gain_value)
         if exp_state == "under":
             g = min(self.config.GAIN_MAX, g + float(self.config.GAIN_STEP))
         elif exp_state == "over":
@@ -476,143 +970,265 @@ class SecurityCamService:
             elif g < 1.0:
                 g = min(1.0, g + step)
         else:
-            return
+            return None
 
-        if abs(g - getattr(self, "_gain_value", 0.0)) < 1e-6:
-            return
-        if self.camera.set_gain(g):
-            self._gain_value = g
-            self._gain_last_update = now
-            try:
-                self._adjust_pause_until = now + float(self.config.MOTION_ADJUST_PAUSE_SEC)
-                self.detector.reset()
-                self._seed_at_resume = True
-            except Exception:
-                pass
+        if abs(g - self._gain_value) < 1e-6:
+            return None
+        return g
 
-    def _maybe_adjust_shutter(self, exp_state: str) -> None:
-        """Adapt manual exposure time (shutter) for dim/bright scenes.
+    def _plan_shutter_adjust(self, exp_state: str, now: float) -> tuple:
+        """Return `(shutter_us_target, reenable_ae)` for this tick.
 
-        Switches to manual exposure when under-exposed and ramps exposure time up
-        to `SHUTTER_MAX_US`. When exposure returns to normal or bright, ramps
-        down toward `SHUTTER_BASE_US` and re-enables AE when near base.
+        `shutter_us_target` is None when no manual shutter step is due;
+        `reenable_ae` is True when the shutter is (or lands) near base and
+        auto-exposure should take over again.
         """
-        if not self.config.SHUTTER_ADAPT_ENABLE:
-            return
-        if not hasattr(self.camera, "set_shutter") or not getattr(self.camera, "supports_shutter")():
-            return
-        now = time.time()
-        last = getattr(self, "_shutter_last_update", 0.0)
-        if now - last < float(self.config.SHUTTER_UPDATE_INTERVAL_SEC):
-            return
+        if not self.config.SHUTTER_ADAPT_ENABLE or not self._cap_shutter:
+            return None, False
+        if now - self._shutter_last_update < float(self.config.SHUTTER_UPDATE_INTERVAL_SEC):
+            return None, False
 
-        cur = int(getattr(self, "_shutter_us", int(self.config.SHUTTER_BASE_US)))
+        cur = int(self._shutter_us)
         base = int(self.config.SHUTTER_BASE_US)
-        changed = False
-
         if exp_state == "under":
             # Switch to manual exposure and increase shutter time
             target = min(self.config.SHUTTER_MAX_US, cur + int(self.config.SHUTTER_STEP_US))
-            if target != cur:
-                if self.camera.set_shutter(target):
-                    self._shutter_us = target
-                    self._manual_exposure = True
-                    changed = True
-                    try:
-                        self._adjust_pause_until = now + float(self.config.MOTION_ADJUST_PAUSE_SEC)
-                        self.detector.reset()
-                        self._seed_at_resume = True
-                    except Exception:
-                        pass
-        elif exp_state in ("normal", "over"):
+            return (target if target != cur else None), False
+        if exp_state in ("normal", "over"):
             # Reduce shutter toward base; re-enable AE near base
             step = int(self.config.SHUTTER_RETURN_STEP_US)
-            if cur > base:
-                target = max(base, cur - step)
-                if self.camera.set_shutter(target):
-                    self._shutter_us = target
-                    self._manual_exposure = True
-                    changed = True
-                    try:
-                        self._adjust_pause_until = now + float(self.config.MOTION_ADJUST_PAUSE_SEC)
-                        self.detector.reset()
-                        self._seed_at_resume = True
-                    except Exception:
-                        pass
-            # If near base, re-enable AE and stop manual control
-            if abs(self._shutter_us - base) <= step:
-                if hasattr(self.camera, "set_auto_exposure"):
-                    if self.camera.set_auto_exposure(True):
-                        self._manual_exposure = False
+            target = max(base, cur - step) if cur > base else None
+            projected = cur if target is None else target
+            reenable_ae = self._manual_exposure and abs(projected - base) <= step
+            return target, reenable_ae
+        return None, False
+
+    def _apply_camera_adjustments(self, exp_state: str, now: float) -> None:
+        """Plan EV/gain/shutter steps and apply them in one batched call.
+
+        The three planners only compute targets; all resulting controls are
+        issued through a single `camera.set_controls` round-trip (libcamera
+        applies them atomically on one frame), followed by a single detector
+        reseed and pause window instead of up to three.
+
+        Args:
+          exp_state: 'over' | 'under' | 'normal' | 'off'
+          now: Monotonic timestamp read once per loop iteration in `_run`.
+        """
+        ev = self._plan_ev_adjust(exp_state, now)
+        gain = self._plan_gain_adjust(exp_state, now)
+        shutter, reenable_ae = self._plan_shutter_adjust(exp_state, now)
 
-        if changed:
+        controls: dict = {}
+        if ev is not None:
+            # EV-bias relies on auto-exposure being active
+            controls["AeEnable"] = True
+            controls["ExposureValue"] = float(ev)
+        if gain is not None:
+            controls["AnalogueGain"] = float(gain)
+        if shutter is not None:
+            us = int(shutter)
+            # Manual exposure step; AE stays off unless we land near base.
+            # This intentionally overrides the EV planner's AeEnable above,
+            # matching the previous last-call-wins ordering.
+            controls["AeEnable"] = bool(reenable_ae)
+            controls["ExposureTime"] = us
+            controls["FrameDurationLimits"] = (us, max(us, us + 1000))
+        elif reenable_ae:
+            controls["AeEnable"] = True
+
+        if not controls:
+            return
+        if not self.camera.set_controls(controls):
+            return
+
+        # Commit the applied targets and schedule one reseed/pause for the batch
+        if ev is not None:
+            self._ev_bias = ev
+            self._ev_last_update = now
+        if gain is not None:
+            self._gain_value = gain
+            self._gain_last_update = now
+        if shutter is not None:
+            self._shutter_us = int(shutter)
             self._shutter_last_update = now
+        if shutter is not None or reenable_ae:
+            self._manual_exposure = not reenable_ae
+        # Reseed around significant camera control changes to avoid false triggers
+        self._adjust_pause_until = now + float(self.config.MOTION_ADJUST_PAUSE_SEC)
+        try:
+            self.detector.reset()
+        except Exception:
+            pass
+        self._seed_at_resume = True
 
     # NOIR colour-gain adjustment removed
 
-    def _maybe_save_frame(self, frame: np.ndarray, detections) -> None:
-        """Annotate and save the frame if save rate permits."""
-        now = time.time()
+    def _maybe_save_frame(self, frame: np.ndarray, detections, now: float) -> None:
+        """Annotate and save the frame if save rate permits.
+
+        Args:
+          frame: Processed BGR frame to persist.
+          detections: Detection results to annotate.
+          now: Monotonic timestamp read once per loop iteration in `_run`.
+        """
+        if not (self.config.SAVE_ANNOTATED_ON_DETECT or self.config.SAVE_RAW_ON_DETECT):
+            return
         if now - self._last_saved_ts < self.config.SAVE_INTERVAL_SEC:
             return
-        # Always build an annotated variant for SAVE_DIR when enabled
-        annotated = frame.copy()
-        for det in detections:
-            x, y, w, h = det.bbox
-            kind = getattr(det, "kind", "person")
-            # BGR colors: red for person, cyan/yellowish for face, magenta for others
-            if kind == "person":
-                color = (0, 0, 255)
-            elif kind == "face":
-                color = (255, 200, 0)
-            else:
-                color = (255, 0, 255)
-            cv2.rectangle(annotated, (x, y), (x + w, y + h), color, 2)
-            # Label background and text
-            label = f"{kind}"
-            (tw, th), baseline = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
-            bx1, by1 = x, max(0, y - th - baseline - 4)
-            bx2, by2 = x + tw + 6, y
-            cv2.rectangle(annotated, (bx1, by1), (bx2, by2), color, thickness=-1)
-            cv2.putText(annotated, label, (x + 3, y - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1, cv2.LINE_AA)
+        # Wall clock only for the user-visible timestamp in the filename
+        wall = time.time()
         ts_str = time.strftime("%Y%m%d-%H%M%S")
-        ms = int((now - int(now)) * 1000)
+        ms = int((wall - int(wall)) * 1000)
         filename = f"detect_{ts_str}_{ms:03d}.jpg"
         if self.config.SAVE_ANNOTATED_ON_DETECT:
+            # Only build the annotated variant when it will actually be saved;
+            # copying and drawing are wasted work in raw-only configurations
+            annotated = frame.copy()
+            # Group bounding boxes by kind so all rectangles of one color go
+            # through a single cv2.polylines call instead of one cv2.rectangle
+            # per detection (amortizes the Python->OpenCV transitions)
+            groups: dict = {}
+            for det in detections:
+                groups.setdefault(getattr(det, "kind", "person"), []).append(det.bbox)
+            for kind, boxes in groups.items():
+                # BGR colors: red for person, cyan/yellowish for face, magenta for others
+                if kind == "person":
+                    color = (0, 0, 255)
+                elif kind == "face":
+                    color = (255, 200, 0)
+                else:
+                    color = (255, 0, 255)
+                pts = np.array(
+                    [[[x, y], [x + w, y], [x + w, y + h], [x, y + h]] for x, y, w, h in boxes],
+                    dtype=np.int32,
+                )
+                cv2.polylines(annotated, pts, True, color, 2)
+                # Label geometry is constant per kind; measure once per process
+                size = _LABEL_SIZES.get(kind)
+                if size is None:
+                    size = _LABEL_SIZES[kind] = cv2.getTextSize(kind, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+                (tw, th), baseline = size
+                for x, y, w, h in boxes:
+                    bx1, by1 = x, max(0, y - th - baseline - 4)
+                    bx2, by2 = x + tw + 6, y
+                    cv2.rectangle(annotated, (bx1, by1), (bx2, by2), color, thickness=-1)
+                    cv2.putText(annotated, kind, (x + 3, y - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1, cv2.LINE_AA)
             path = os.path.join(self.config.SAVE_DIR, filename)
             try:
-                cv2.imwrite(path, annotated)
-                self.state.saved_images_count += 1
+                self._save_q.put_nowait((path, annotated, True))
                 self._last_saved_ts = now
-                self._enforce_retention(self.config.SAVE_DIR)
-            except Exception:
-                pass
+            except queue.Full:
+                pass  # Writer is behind; drop this save rather than block capture
         # Also save raw (no-annotation) copy if configured
         if self.config.SAVE_RAW_ON_DETECT:
+            raw_path = os.path.join(self.config.SAVE_DIR_RAW, filename)
+            try:
+                # Copy before queueing: the capture loop reuses per-slot
+                # buffers, and a queued frame can outlive the slot's wrap
+                self._save_q.put_nowait((raw_path, frame.copy(), False))
+            except queue.Full:
+                pass
+
+    def _save_run(self) -> None:
+        """Writer thread: encode and persist queued frames off the hot path.
+
+        Consumes `(path, frame, is_annotated)` tuples, so the JPEG encode, the
+        disk write, and retention all happen here instead of in the detection
+        worker. Drains remaining items on shutdown before exiting.
+        """
+        # Encode at configured quality with Huffman optimization and
+        # progressive mode off: both only add encode time here
+        quality = int(self.config.SAVE_JPEG_QUALITY)
+        encode_params = [
+            cv2.IMWRITE_JPEG_QUALITY, quality,
+            cv2.IMWRITE_JPEG_OPTIMIZE, 0,
+            cv2.IMWRITE_JPEG_PROGRESSIVE, 0,
+        ]
+        # libjpeg-turbo (simplejpeg) encodes BGR directly and is markedly
+        # faster than OpenCV's bundled encoder on the Pi
+        use_turbo = simplejpeg is not None and self.config.SAVE_USE_TURBOJPEG
+        thumb_w = int(self.config.THUMB_WIDTH)
+        thumb_quality = int(self.config.THUMB_JPEG_QUALITY)
+        thumb_params = [
+            cv2.IMWRITE_JPEG_QUALITY, thumb_quality,
+            cv2.IMWRITE_JPEG_OPTIMIZE, 0,
+            cv2.IMWRITE_JPEG_PROGRESSIVE, 0,
+        ]
+        while True:
+            try:
+                path, img, is_annotated = self._save_q.get(timeout=0.5)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
             try:
-                raw_path = os.path.join(self.config.SAVE_DIR_RAW, filename)
-                cv2.imwrite(raw_path, frame)
-                self._enforce_retention(self.config.SAVE_DIR_RAW)
+                if use_turbo:
+                    buf = simplejpeg.encode_jpeg(
+                        np.ascontiguousarray(img), quality=quality, colorspace="BGR", fastdct=True
+                    )
+                    with open(path, "wb") as fh:
+                        fh.write(buf)
+                else:
+                    cv2.imwrite(path, img, encode_params)
+                if is_annotated:
+                    self.state.saved_images_count += 1
+                    if self.config.SAVE_THUMBNAILS:
+                        # Downscaled variant for the gallery grids: the tiles
+                        # render at thumbnail size, so full-resolution bytes
+                        # on that page are pure bandwidth waste
+                        h, w = img.shape[:2]
+                        th = max(1, round(h * thumb_w / w))
+                        thumb = cv2.resize(img, (thumb_w, th), interpolation=cv2.INTER_AREA)
+                        thumb_path = os.path.join(
+                            self.config.SAVE_DIR_THUMB, os.path.basename(path)
+                        )
+                        if use_turbo:
+                            tbuf = simplejpeg.encode_jpeg(
+                                np.ascontiguousarray(thumb),
+                                quality=thumb_quality, colorspace="BGR", fastdct=True,
+                            )
+                            with open(thumb_path, "wb") as fh:
+                                fh.write(tbuf)
+                        else:
+                            cv2.imwrite(thumb_path, thumb, thumb_params)
+                        self._record_saved(thumb_path)
+                self._record_saved(path)
             except Exception:
                 pass
 
-    def _enforce_retention(self, folder: Optional[str] = None) -> None:
-        """Keep only the newest MAX_SAVED_IMAGES by deleting oldest files in a folder."""
-        base = folder or self.config.SAVE_DIR
+    def _seed_saved_files(self, folder: str) -> deque:
+        """Scan a save folder once and return its .jpg paths oldest-first."""
         try:
-            files = [
-                os.path.join(base, f)
-                for f in os.listdir(base)
-                if f.lower().endswith(".jpg")
-            ]
+            with os.scandir(folder) as it:
+                files = [
+                    (entry.path, entry.stat().st_mtime)
+                    for entry in it
+                    if entry.name.lower().endswith(".jpg")
+                ]
         except FileNotFoundError:
-            return
-        if len(files) <= self.config.MAX_SAVED_IMAGES:
-            return
-        files.sort(key=lambda p: os.path.getmtime(p))  # oldest first
-        to_delete = len(files) - self.config.MAX_SAVED_IMAGES
-        for p in files[:to_delete]:
+            return deque()
+        files.sort(key=lambda pm: pm[1])
+        return deque(path for path, _ in files)
+
+    def _record_saved(self, path: str) -> None:
+        """Track a newly saved image and enforce retention in O(1).
+
+        Keeps only the newest MAX_SAVED_IMAGES per folder by popping and
+        deleting from the head of the in-memory deque, instead of rescanning
+        the directory on every save.
+        """
+        folder = os.path.dirname(path)
+        files = self._saved_files.get(folder)
+        if files is None:
+            files = self._seed_saved_files(folder)
+            self._saved_files[folder] = files
+        files.append(path)
+        limit = int(self.config.MAX_SAVED_IMAGES)
+        while len(files) > limit:
             try:
-                os.remove(p)
+                os.remove(files.popleft())
             except Exception:
                 pass
+        if folder == self.config.SAVE_DIR:
+            self._recent_names = [os.path.basename(p) for p in reversed(files)]
@@ -1,15 +1,34 @@
 """Flask web application for the security camera dashboard and API."""
 
+import gzip  # Pre-compressed HTML responses
 import os  # For file path operations
+import re  # Whitespace minification of the inline templates
+import threading  # Lock for the rendered-page gzip cache
 import time  # For timestamps and simple cache control
 
-import cv2  # For JPEG encoding
 import flask  # Web server and templating
 
+try:
+    import orjson  # Optional fast JSON serializer; absent on minimal installs
+except Exception:
+    orjson = None
+
 from .config import Config  # App configuration
 from .service import SecurityCamService  # Service providing frames and state
 
 
+def _minify_html(source: str) -> str:
+    """Strip comments and leading indentation from an HTML/Jinja source.
+
+    The inline templates are written for readability with heavy indentation;
+    collapsing it once at startup shrinks every rendered response without a
+    minifier dependency, and is safe for both the HTML and the Jinja tags.
+    """
+    source = re.sub(r"<!--.*?-->", "", source, flags=re.S)
+    source = re.sub(r"\n\s+", "\n", source)
+    return source.strip()
+
+
 def create_app(service: SecurityCamService) -> flask.Flask:
     """Create and configure the Flask application.
 
@@ -20,48 +39,94 @@ def create_app(service: SecurityCamService) -> flask.Flask:
       A Flask app instance with routes for dashboard, images, and API.
     """
     app = flask.Flask(__name__)
+    # With a reverse proxy in front, let it serve capture files via
+    # sendfile(2) instead of routing the bytes through Werkzeug
+    app.use_x_sendfile = Config.USE_X_SENDFILE
+
+    # Compile the inline templates once (minified): render_template_string
+    # re-hashes the source and consults the template cache on every request,
+    # while a held template object renders directly
+    index_tmpl = app.jinja_env.from_string(_minify_html(_INDEX_TEMPLATE))
+    gallery_tmpl = app.jinja_env.from_string(_minify_html(_GALLERY_TEMPLATE))
+
+    # Rendered-page gzip cache: successive refreshes often produce identical
+    # HTML, so compress once per distinct render per page and replay the bytes
+    gz_lock = threading.Lock()
+    gz_cache: dict = {}  # page name -> (context key, gzipped bytes)
+
+    # Each MJPEG viewer pins a server thread for the connection's lifetime,
+    # so cap them: beyond the limit new viewers get an immediate 503 instead
+    # of silently exhausting the worker pool for dashboard/API requests
+    stream_lock = threading.Lock()
+    stream_clients = [0]
+
+    def render_page(name: str, tmpl, key: tuple, **ctx) -> flask.Response:
+        """Render a template to an HTML response, gzip-cached by context key."""
+        accept = flask.request.headers.get("Accept-Encoding", "")
+        if "gzip" not in accept:
+            return flask.Response(tmpl.render(**ctx), mimetype="text/html")
+        with gz_lock:
+            hit = gz_cache.get(name)
+            if hit is not None and hit[0] == key:
+                body = hit[1]
+            else:
+                body = gzip.compress(tmpl.render(**ctx).encode("utf-8"), 6)
+                gz_cache[name] = (key, body)
+        resp = flask.Response(body, mimetype="text/html")
+        resp.headers["Content-Encoding"] = "gzip"
+        resp.headers["Vary"] = "Accept-Encoding"
+        return resp
 
     @app.route("/")
     def index():
         """Render the main dashboard page."""
-        st = service.get_status()
-        alert_active = (time.time() - st.last_detection_ts) <= Config.ALERT_COOLDOWN_SEC
-        latest_files = service.list_latest_images(Config.GALLERY_LATEST_COUNT)
-
-        # Minimal inline HTML/CSS for a simple dashboard
-        html = flask.render_template_string(
-            _INDEX_TEMPLATE,
-            alert_active=alert_active,
-            saved_count=st.saved_images_count,
-            total_frames=st.total_frames,
-            armed=st.armed,
-            person_count=getattr(st, "person_count", 0),
-            face_count=getattr(st, "face_count", 0),
-            exposure_state=st.exposure_state,
-            ev_bias=getattr(st, "ev_bias", 0.0),
-            gain=getattr(st, "gain", 0.0),
-            shutter_ms=int(getattr(st, "shutter_us", 0) / 1000),
-            latest_files=[os.path.basename(p) for p in latest_files],
+        # One snapshot() call carries every status field; only the
+        # page-specific extras are added here
+        ctx = service.get_status().snapshot()
+        ctx.update(
+            alert_active=(time.time() - ctx["last_detection_ts"]) <= Config.ALERT_COOLDOWN_SEC,
+            latest_files=service.list_latest_images(Config.GALLERY_LATEST_COUNT),
             save_dir=Config.SAVE_DIR,
-            ts=int(time.time()),
         )
-        return html
+        key = tuple(tuple(v) if isinstance(v, list) else v for v in ctx.values())
+        return render_page("index", index_tmpl, key, **ctx)
 
     @app.route("/latest.jpg")
     def latest_jpg():
-        """Serve the most recent frame as a JPEG image."""
-        frame = service.get_latest_frame()
+        """Serve the most recent frame as a JPEG image.
+
+        The frame sequence doubles as the ETag: a client polling faster
+        than frames arrive revalidates with If-None-Match and gets a 304
+        with no JPEG bytes touched or sent.
+        """
+        seq, frame = service.get_latest()
         if frame is None:
             return ("No frame yet", 503)
-        ok, buf = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), 80])
-        if not ok:
+        etag = str(seq)
+        if etag in flask.request.if_none_match:
+            resp = flask.Response(status=304)
+            resp.set_etag(etag)
+            resp.cache_control.no_cache = True
+            return resp
+        seq, body = service.get_latest_jpeg(Config.JPEG_QUALITY)
+        if body is None:
             return ("Encode error", 500)
-        return flask.Response(buf.tobytes(), mimetype="image/jpeg")
+        resp = flask.Response(body, mimetype="image/jpeg")
+        resp.set_etag(str(seq))
+        resp.cache_control.no_cache = True
+        return resp
 
     @app.route("/captures/<path:filename>")
     def captures(filename: str):
-        """Serve a saved capture by filename from the configured directory."""
-        return flask.send_from_directory(Config.SAVE_DIR, filename, mimetype="image/jpeg")
+        """Serve a saved capture by filename from the configured directory.
+
+        Captures never change once written, so they are served with an ETag
+        and a one-hour max-age: gallery refreshes revalidate with conditional
+        GETs and get 304s instead of full bytes.
+        """
+        return flask.send_from_directory(
+            Config.SAVE_DIR, filename, mimetype="image/jpeg", conditional=True, max_age=3600
+        )
 
     @app.route("/captures_raw/<path:filename>")
     def captures_raw(filename: str):
@@ -69,69 +134,98 @@ def create_app(service: SecurityCamService) -> flask.Flask:
 
         This allows clicking an annotated thumbnail to view the corresponding raw image.
         """
-        raw_path = os.path.join(Config.SAVE_DIR_RAW, filename)
-        if os.path.isfile(raw_path):
-            return flask.send_from_directory(Config.SAVE_DIR_RAW, filename, mimetype="image/jpeg")
-        # Fallback gracefully to annotated if raw isn't available
-        return flask.send_from_directory(Config.SAVE_DIR, filename, mimetype="image/jpeg")
+        # send_from_directory keeps werkzeug's safe_join containment (a bare
+        # send_file on a joined path would allow ../ traversal) and still
+        # honors conditional requests and use_x_sendfile, since it delegates
+        # to send_file internally
+        directory = Config.SAVE_DIR_RAW
+        if not os.path.isfile(os.path.join(directory, filename)):
+            # Fallback gracefully to annotated if raw isn't available
+            directory = Config.SAVE_DIR
+        return flask.send_from_directory(
+            directory, filename, mimetype="image/jpeg", conditional=True, max_age=3600
+        )
+
+    @app.route("/thumb/<path:filename>")
+    def thumb(filename: str):
+        """Serve a downscaled thumbnail of a saved capture.
+
+        Thumbnails never change once written, so they get a week-long
+        immutable cache policy. Captures saved before thumbnailing existed
+        fall back to the full-resolution annotated file.
+        """
+        directory = Config.SAVE_DIR_THUMB
+        if not os.path.isfile(os.path.join(directory, filename)):
+            directory = Config.SAVE_DIR
+        resp = flask.send_from_directory(
+            directory, filename, mimetype="image/jpeg", conditional=True, max_age=604800
+        )
+        resp.headers["Cache-Control"] = "public, max-age=604800, immutable"
+        return resp
 
     @app.route("/gallery")
     def gallery():
-        """Render a gallery page showing all annotated captures (newest first)."""
-        try:
-            files = [
-                f for f in os.listdir(Config.SAVE_DIR) if f.lower().endswith(".jpg")
-            ]
-        except FileNotFoundError:
-            files = []
-        # Sort by mtime (newest first)
-        files.sort(key=lambda f: os.path.getmtime(os.path.join(Config.SAVE_DIR, f)), reverse=True)
-        html = flask.render_template_string(
-            _GALLERY_TEMPLATE,
-            files=files,
-            save_dir=Config.SAVE_DIR,
-            ts=int(time.time()),
-        )
-        return html
+        """Render a gallery page showing all annotated captures (newest first).
+
+        The listing comes from the service's in-memory bookkeeping (kept by
+        the writer thread), so no directory scan or stat runs per request.
+        """
+        files = service.list_all_images()
+        return render_page("gallery", gallery_tmpl, tuple(files), files=files, save_dir=Config.SAVE_DIR)
 
     @app.route("/api/state")
     def api_state():
         """Return the current service state as JSON."""
-        st = service.get_status()
-        return {
-            "detecting": st.detecting,
-            "last_detection_ts": st.last_detection_ts,
-            "saved_images_count": st.saved_images_count,
-            "total_frames": st.total_frames,
-            "armed": st.armed,
-            "exposure_state": st.exposure_state,
-            "exposure_mean": st.exposure_mean,
-            "exposure_low_clip": st.exposure_low_clip,
-            "exposure_high_clip": st.exposure_high_clip,
-            "detect_stride": st.detect_stride,
-            "hit_threshold": st.hit_threshold,
-            "person_count": getattr(st, "person_count", 0),
-            "face_count": getattr(st, "face_count", 0),
-            "kinds": getattr(st, "last_kinds", []),
-            "ev_bias": getattr(st, "ev_bias", 0.0),
-            "gain": getattr(st, "gain", 0.0),
-            "shutter_us": getattr(st, "shutter_us", 0),
-        }
+        seq, _ = service.get_latest()
+        payload = service.get_status().snapshot()
+        payload["frame_seq"] = seq
+        if orjson is not None:
+            # orjson serializes in C and returns bytes directly, skipping
+            # Flask's jsonify machinery on this once-per-second poll endpoint
+            return flask.Response(orjson.dumps(payload), mimetype="application/json")
+        return payload
 
     @app.route("/stream.mjpg")
     def stream_mjpg():
-        """Provide a multipart/x-mixed-replace MJPEG live stream."""
+        """Provide a multipart/x-mixed-replace MJPEG live stream.
+
+        Concurrent viewers are limited to `Config.STREAM_MAX_CLIENTS`; a
+        viewer over the limit gets a 503 with Retry-After rather than tying
+        up another worker thread indefinitely.
+        """
+        with stream_lock:
+            if stream_clients[0] >= Config.STREAM_MAX_CLIENTS:
+                resp = flask.Response("Too many stream viewers", status=503)
+                resp.headers["Retry-After"] = "5"
+                return resp
+            stream_clients[0] += 1
+
         def gen():
-            boundary = b"--frame"
-            while True:
-                frame = service.get_latest_frame()
-                if frame is None:
-                    time.sleep(0.05)
-                    continue
-                ok, buf = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), 60])
-                if not ok:
-                    continue
-                yield boundary + b"\r\nContent-Type: image/jpeg\r\n\r\n" + buf.tobytes() + b"\r\n"
+            # Block on the service's new-frame condition instead of polling:
+            # each client wakes exactly once per captured frame, and the
+            # per-client sequence guard skips frames it has already sent
+            part_header = b"--frame\r\nContent-Type: image/jpeg\r\n\r\n"
+            crlf = b"\r\n"
+            last_seq = -1
+            try:
+                while True:
+                    if not service.wait_for_frame(1.0):
+                        continue
+                    seq, body = service.get_latest_jpeg(Config.JPEG_QUALITY)
+                    if body is None or seq == last_seq:
+                        continue
+                    last_seq = seq
+                    # Yield the part in pieces: concatenating header + JPEG +
+                    # CRLF would allocate and memcpy a combined buffer per frame
+                    # per client; the WSGI layer writes each chunk as-is
+                    yield part_header
+                    yield body
+                    yield crlf
+            finally:
+                # Runs when the client disconnects and Werkzeug closes the
+                # generator, releasing the viewer slot
+                with stream_lock:
+                    stream_clients[0] -= 1
 
         return flask.Response(gen(), mimetype="multipart/x-mixed-replace; boundary=frame")
 
@@ -170,8 +264,6 @@ _INDEX_TEMPLATE = """
     .live { max-width: 640px; margin-bottom: 16px; }
     .meta { color: #9aa; font-size: 12px; }
   </style>
-  <meta http-equiv="refresh" content="5">
-  <!-- lightweight auto-refresh every 5s for status and gallery -->
   </head>
   <body>
     <header>
@@ -198,27 +290,23 @@ _INDEX_TEMPLATE = """
         <span class="pill cam">Gain {{ '%.2f' % gain }}</span>
         <span class="pill cam">Shtr {{ shutter_ms }} ms</span>
       </div>
-      {% if alert_active %}
-        <div class="alert on">MOTION DETECTED</div>
-      {% else %}
-        <div class="alert off">Idle</div>
-      {% endif %}
+      <div id="alert" class="alert {{ 'on' if alert_active else 'off' }}">{{ 'MOTION DETECTED' if alert_active else 'Idle' }}</div>
       <nav style="display:flex; align-items:center; gap:10px; margin-left:auto;">
-        <a href="{{ url_for('gallery') }}" style="color:#4da3ff; text-decoration: underline;">Gallery</a>
+        <a href="/gallery" style="color:#4da3ff; text-decoration: underline;">Gallery</a>
       </nav>
     </header>
     <main>
       <div class="live card">
-        <img src="/latest.jpg?ts={{ts}}" alt="Latest frame" />
-        <div class="meta">Saved: {{saved_count}} &nbsp; | &nbsp; Frames: {{total_frames}}</div>
+        <img id="live" src="/latest.jpg" alt="Latest frame" />
+        <div class="meta">Saved: <span id="saved">{{saved_images_count}}</span> &nbsp; | &nbsp; Frames: <span id="frames">{{total_frames}}</span></div>
       </div>
       <h3>Recent Captures</h3>
       <div class="meta">From: {{save_dir}}</div>
       <div class="grid">
         {% for f in latest_files %}
           <div class="card">
-            <a href="{{ url_for('captures_raw', filename=f) }}" target="_blank" rel="noopener" title="Click to view raw (unannotated)">
-              <img src="{{ url_for('captures', filename=f) }}?ts={{ts}}" alt="{{f}}" />
+            <a href="/captures_raw/{{ f|urlencode }}" target="_blank" rel="noopener" title="Click to view raw (unannotated)">
+              <img src="/thumb/{{ f|urlencode }}" alt="{{f}}" />
             </a>
           </div>
         {% else %}
@@ -226,6 +314,23 @@ _INDEX_TEMPLATE = """
         {% endfor %}
       </div>
     </main>
+    <script>
+      // Poll the ~300-byte state JSON instead of reloading the whole page
+      // (the old meta-refresh re-fetched the HTML and every thumbnail)
+      setInterval(async () => {
+        try {
+          const s = await (await fetch('/api/state')).json();
+          const alert = document.getElementById('alert');
+          alert.className = 'alert ' + (s.detecting ? 'on' : 'off');
+          alert.textContent = s.detecting ? 'MOTION DETECTED' : 'Idle';
+          document.getElementById('saved').textContent = s.saved_images_count;
+          document.getElementById('frames').textContent = s.total_frames;
+          const live = document.getElementById('live');
+          const src = '/latest.jpg?seq=' + s.frame_seq;
+          if (live.getAttribute('src') !== src) live.src = src;
+        } catch (e) { /* transient fetch errors are fine */ }
+      }, 1000);
+    </script>
   </body>
 </html>
 """
@@ -260,8 +365,8 @@ _GALLERY_TEMPLATE = """
     <div class="grid">
       {% for f in files %}
         <div class="card">
-          <a href="{{ url_for('captures_raw', filename=f) }}" target="_blank" rel="noopener" title="Click to view raw (unannotated)">
-            <img src="{{ url_for('captures', filename=f) }}?ts={{ts}}" alt="{{f}}" />
+          <a href="/captures_raw/{{ f|urlencode }}" target="_blank" rel="noopener" title="Click to view raw (unannotated)">
+            <img src="/thumb/{{ f|urlencode }}" alt="{{f}}" />
           </a>
           <div class="meta">{{ f }}</div>
         </div>